@@ -1,34 +1,51 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from functools import lru_cache
 from typing import List
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
 from src.storage.json_store import QuizJsonStore
-from src.services.quiz_generator import generate_quiz_from_notes
-from src.api.schemas import NoteIn, QuizOut, QuizMetaOut
+from src.services.quiz_generator import generate_quiz_from_notes, quiz_id_for_notes
+from src.api.schemas import NoteIn, QuizOut, QuizMetaOut, QuizQuestion
 
 # Load environment variables from a .env file if present
 load_dotenv()
 
+# Comma-separated allowed origins for CORS; all origins when unset
+_cors = os.getenv("CORS_ALLOW_ORIGINS")
+CORS_ORIGINS = _cors.split(",") if _cors else ["*"]
+
 openapi_tags = [
     {"name": "System", "description": "System and service endpoints"},
     {"name": "Quizzes", "description": "Quiz generation and retrieval endpoints"},
 ]
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Flush any batched quiz writes when the application shuts down."""
+    yield
+    await get_store().aclose()
+
+
 app = FastAPI(
     title="Study Notes Quiz Backend",
     description="Backend service for generating and storing quizzes from study notes.",
     version="0.1.0",
     openapi_tags=openapi_tags,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # CORS configuration to allow frontend integration (adjust origins in env if needed)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=os.getenv("CORS_ALLOW_ORIGINS", "*").split(",") if os.getenv("CORS_ALLOW_ORIGINS") else ["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -45,14 +62,25 @@ def get_store() -> QuizJsonStore:
 def _get_store_singleton() -> QuizJsonStore:
     """
     Internal cached constructor for the store. Uses QUIZ_DATA_FILE if set,
-    otherwise defaults to './data/quizzes.json'.
+    otherwise defaults to './data/quizzes.jsonl'.
     """
     path = os.getenv("QUIZ_DATA_FILE")
     return QuizJsonStore(path=path)
 
 
+def _quiz_out(quiz: dict) -> QuizOut:
+    """
+    Build a QuizOut from a trusted internal quiz dict without re-running validation.
+
+    Quizzes are produced by the generator or loaded from our own store, so field
+    validation on the response path is redundant work.
+    """
+    questions = [QuizQuestion.model_construct(**q) for q in quiz.get("questions", []) or []]
+    return QuizOut.model_construct(**{**quiz, "questions": questions})
+
+
 @app.get("/", summary="Health Check", tags=["System"])
-def health_check():
+async def health_check():
     """
     Health check endpoint.
 
@@ -62,19 +90,20 @@ def health_check():
     # Touch the store to ensure file/dir is created on startup
     store = get_store()
     # Load ensures file exists with default structure
-    _ = store.load_all()
+    _ = await store.load_all()
     return {"message": "Healthy", "data_file": store.path}
 
 
 @app.post(
     "/notes",
-    response_model=QuizOut,
+    response_model=None,
+    responses={status.HTTP_201_CREATED: {"model": QuizOut}},
     status_code=status.HTTP_201_CREATED,
     summary="Generate quiz from study notes",
     description="Accepts raw study notes and an optional title, generates a deterministic quiz, persists it, and returns the quiz.",
     tags=["Quizzes"],
 )
-def submit_notes(note_in: NoteIn) -> QuizOut:
+async def submit_notes(note_in: NoteIn) -> QuizOut:
     """
     Create a quiz from provided notes and persist it.
 
@@ -86,64 +115,64 @@ def submit_notes(note_in: NoteIn) -> QuizOut:
 
     Notes:
         - Deterministic generation ensures identical notes produce the same quiz ID and content.
-        - The quiz is appended to the JSON store for later retrieval.
+        - The quiz is appended to the JSON Lines store for later retrieval.
+        - Resubmitting notes that are already stored returns the persisted quiz without
+          regenerating it, unless a different title is requested.
     """
     notes = (note_in.notes or "").strip()
     if not notes:
         raise HTTPException(status_code=400, detail="Notes content cannot be empty")
 
-    quiz = generate_quiz_from_notes(notes=notes, title=note_in.title)
+    title = note_in.title.strip() if note_in.title else None
     store = get_store()
 
-    # If a quiz with same id already exists, we still store another copy only if not already present.
+    # The quiz id depends only on the notes, so a stored quiz can be found before generating.
+    existing = await store.get_quiz(quiz_id_for_notes(notes))
+    if existing is not None and (not title or existing.get("title") == title):
+        return _quiz_out(existing)
+
+    # Generation is CPU-bound; run it off the event loop so other requests are not stalled
+    quiz = await asyncio.to_thread(generate_quiz_from_notes, notes=notes, title=note_in.title)
+
     # To keep idempotency for same notes, avoid duplicate persist for same id.
-    existing = store.get_quiz(quiz.get("id"))
     if existing is None:
-        store.add_quiz(quiz)
+        # A concurrent submission of the same notes may have stored it first; use the stored copy
+        quiz = await store.add_quiz(quiz)
 
-    # Validate output matches schema shape implicitly via response_model
-    return QuizOut(**quiz)
+    # Output is trusted generator data; skip response validation
+    return _quiz_out(quiz)
 
 
 @app.get(
     "/quizzes",
-    response_model=List[QuizMetaOut],
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": List[QuizMetaOut]}},
     summary="List quizzes",
     description="Returns a list of quiz metadata, including id, title, created_at, and question_count.",
     tags=["Quizzes"],
 )
-def list_quizzes() -> List[QuizMetaOut]:
+async def list_quizzes() -> List[QuizMetaOut]:
     """
-    List all stored quizzes.
+    List all stored quizzes, newest first.
 
     Returns:
         List[QuizMetaOut]: Collection of quiz metadata entries.
     """
     store = get_store()
-    quizzes = store.list_quizzes()
-    metas = [
-        QuizMetaOut(
-            id=q.get("id", ""),
-            title=q.get("title", ""),
-            created_at=q.get("created_at", ""),
-            question_count=len(q.get("questions", []) or []),
-        )
-        for q in quizzes
-        if isinstance(q, dict)
-    ]
-    # Sort newest first by created_at string (already stable-like)
-    metas.sort(key=lambda m: m.created_at, reverse=True)
-    return metas
+    # The store keeps compact metadata entries already ordered newest first by created_at
+    metas = await store.list_quiz_metas()
+    return [QuizMetaOut.model_construct(**m) for m in metas]
 
 
 @app.get(
     "/quizzes/{quiz_id}",
-    response_model=QuizOut,
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": QuizOut}},
     summary="Get quiz by id",
     description="Returns the full quiz payload for the specified quiz identifier.",
     tags=["Quizzes"],
 )
-def get_quiz(quiz_id: str) -> QuizOut:
+async def get_quiz(quiz_id: str) -> Response:
     """
     Retrieve a single quiz by identifier.
 
@@ -151,13 +180,13 @@ def get_quiz(quiz_id: str) -> QuizOut:
         quiz_id: The quiz identifier (e.g., 'quiz-<hashprefix>').
 
     Returns:
-        QuizOut: Full quiz payload.
+        Response: Full quiz payload (QuizOut shape), served from the store's cached JSON encoding.
 
     Raises:
         HTTPException 404 if the quiz is not found.
     """
     store = get_store()
-    quiz = store.get_quiz(quiz_id)
-    if not quiz:
+    payload = await store.get_quiz_json(quiz_id)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    return QuizOut(**quiz)
+    return Response(content=payload, media_type="application/json")
@@ -1,13 +1,17 @@
+import bisect
 import hashlib
 import random
 import re
 import string
+import struct
+from collections import Counter
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Optional, Tuple, Dict
 
 
 # A compact English stopword list to improve keyword extraction without external deps.
-_STOPWORDS = {
+_STOPWORDS = frozenset({
     "a", "an", "the", "and", "or", "but", "if", "while", "as", "of", "in", "on", "for", "to", "from", "by",
     "with", "without", "at", "about", "into", "over", "after", "before", "between", "through", "during", "above",
     "below", "up", "down", "out", "off", "again", "further", "then", "once",
@@ -19,30 +23,49 @@ _STOPWORDS = {
     "can", "could", "should", "would", "may", "might", "must", "will", "shall",
     "not", "no", "nor", "only", "own", "same", "so", "than", "too", "very",
     "what", "which", "who", "whom", "where", "when", "why", "how",
-}
+})
 
 _SENTENCE_SPLIT_REGEX = re.compile(r"(?<=[.!?])\s+")
 _TOKEN_REGEX = re.compile(r"[A-Za-z]+")
+_WS_COLLAPSE = re.compile(r"\s+")
+_STRIP_CHARS = string.punctuation + string.whitespace
 
 
-@dataclass
+@dataclass(frozen=True)
 class Candidate:
     """Internal term candidate with frequency and examples of sentences."""
     term: str
     freq: int
-    sentences: List[str]
+    sentences: Tuple[str, ...]
 
 
-def _stable_hash(text: str) -> str:
-    """Return a stable hex digest for the input text."""
-    # Using SHA256 for stability and uniformity
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+def _stable_digest(text: str) -> bytes:
+    """Return a stable raw SHA-256 digest for the input text."""
+    # hashlib's sha256 is OpenSSL-backed in CPython, which uses SHA-NI where the CPU has it.
+    # Callers derive the hex form, seed and timestamp from this single digest.
+    return hashlib.sha256(text.encode("utf-8")).digest()
 
 
-def _seed_from_hash(hex_digest: str) -> int:
-    """Derive a deterministic integer seed from a hex digest."""
-    # Take the first 16 hex chars for a 64-bit int
-    return int(hex_digest[:16], 16)
+def _quiz_id_from_hash(hex_digest: str) -> str:
+    """Derive the quiz identifier from the notes hex digest."""
+    return f"quiz-{hex_digest[:12]}"
+
+
+# PUBLIC_INTERFACE
+def quiz_id_for_notes(notes: str) -> str:
+    """
+    Return the quiz id that generate_quiz_from_notes would assign to these notes.
+
+    This is cheap compared to full generation and lets callers look up an
+    already persisted quiz before generating it again.
+    """
+    return _quiz_id_from_hash(_stable_digest((notes or "").strip()).hex())
+
+
+def _seed_from_digest(digest: bytes) -> int:
+    """Derive a deterministic integer seed from a raw digest."""
+    # Take the first 8 bytes for a 64-bit int (same value as the first 16 hex chars)
+    return int.from_bytes(digest[:8], "big")
 
 
 def _split_sentences(text: str) -> List[str]:
@@ -61,55 +84,116 @@ def _tokenize_alpha(text: str) -> List[str]:
     return [m.group(0).lower() for m in _TOKEN_REGEX.finditer(text)]
 
 
-def _collect_candidates(sentences: List[str]) -> List[Candidate]:
-    """Collect term candidates based on frequency across the entire notes."""
-    freq: Dict[str, int] = {}
-    examples: Dict[str, List[str]] = {}
+@lru_cache(maxsize=128)
+def _collect_candidates(sentences: Tuple[str, ...]) -> Tuple[Candidate, ...]:
+    """
+    Collect term candidates based on frequency across the entire notes.
+
+    Results are memoized on the sentence tuple, so the returned candidates are
+    shared and must not be mutated.
+    """
+    # Tokenize all sentences in a single regex pass; each token is mapped back to
+    # its sentence by bisecting the sentence start offsets.
+    text = "\n".join(sentences)
+    starts: List[int] = []
+    offset = 0
     for sent in sentences:
-        tokens = _tokenize_alpha(sent)
-        for t in tokens:
-            if t in _STOPWORDS or len(t) <= 2:
-                continue
-            freq[t] = freq.get(t, 0) + 1
-            if t not in examples:
-                examples[t] = [sent]
-            elif len(examples[t]) < 3:
-                # Keep up to 3 example sentences where the term appears
-                examples[t].append(sent)
-    candidates = [Candidate(term=k, freq=v, sentences=examples.get(k, [])) for k, v in freq.items()]
+        starts.append(offset)
+        offset += len(sent) + 1
+
+    terms: List[str] = []
+    examples: Dict[str, List[str]] = {}
+    for m in _TOKEN_REGEX.finditer(text):
+        t = m.group(0).lower()
+        if t in _STOPWORDS or len(t) <= 2:
+            continue
+        terms.append(t)
+        sent = sentences[bisect.bisect_right(starts, m.start()) - 1]
+        if t not in examples:
+            examples[t] = [sent]
+        elif len(examples[t]) < 3:
+            # Keep up to 3 example sentences where the term appears
+            examples[t].append(sent)
+    # Counter's update loop runs in C (_collections._count_elements)
+    freq = Counter(terms)
+    candidates = [Candidate(term=k, freq=v, sentences=tuple(examples.get(k, ()))) for k, v in freq.items()]
     # Sort by frequency desc, then term asc for stability
     candidates.sort(key=lambda c: (-c.freq, c.term))
-    return candidates
+    return tuple(candidates)
 
 
-def _pick_distractors(all_terms: List[str], correct: str, rng: random.Random, n: int) -> List[str]:
+def _pick_distractors(term_pool: Tuple[str, ...], correct: str, rng: random.Random, n: int) -> List[str]:
     """Pick n distinct distractors from the pool, avoiding the correct term and duplicates."""
-    pool = [t for t in all_terms if t != correct]
+    # Draw one extra term so n distractors remain even if the correct term is sampled;
+    # the pool itself is built once per quiz rather than filtered per question.
+    sample = rng.sample(term_pool, k=min(len(term_pool), n + 1))
+    pool = [t for t in sample if t != correct]
+    if len(pool) >= n:
+        return pool[:n]
     # For short pools, fallback to slight variations to ensure 3 distractors
-    if len(pool) < n:
-        # Create pseudo-distractors by simple transforms of the correct answer
-        variants = set(pool)
-        base = correct
-        while len(variants) < n:
-            if len(base) > 3:
-                variants.add(base[::-1])  # reversed
-                variants.add(base + rng.choice(["", "s", "ed", "ing"]))
-                variants.add(base.capitalize())
-            else:
-                variants.add(base + rng.choice(["1", "2", "3", "x"]))
-            # Ensure we don't loop forever
-            if len(variants) > 10 * n:
-                break
-        pool = list(variants)
+    # Create pseudo-distractors by simple transforms of the correct answer
+    variants = set(pool)
+    base = correct
+    while len(variants) < n:
+        if len(base) > 3:
+            variants.add(base[::-1])  # reversed
+            variants.add(base + rng.choice(["", "s", "ed", "ing"]))
+            variants.add(base.capitalize())
+        else:
+            variants.add(base + rng.choice(["1", "2", "3", "x"]))
+        # Ensure we don't loop forever
+        if len(variants) > 10 * n:
+            break
+    pool = list(variants)
     rng.shuffle(pool)
     return pool[:n]
 
 
+def _is_word_char(c: str) -> bool:
+    """Return True if c counts as a word character for regex \\b purposes."""
+    return c.isalnum() or c == "_"
+
+
+def _blank_whole_words(term: str, sentence: str) -> Optional[str]:
+    """
+    Replace whole-word, case-insensitive occurrences of term with a blank via str.find.
+
+    Returns None when no occurrence was found or when lowercasing changes the
+    sentence length (so offsets would not line up); callers fall back to regex.
+    """
+    lowered = sentence.lower()
+    if len(lowered) != len(sentence):
+        return None
+    needle = term.lower()
+    if not needle:
+        return None
+    parts: List[str] = []
+    last = 0
+    pos = lowered.find(needle)
+    while pos != -1:
+        end = pos + len(needle)
+        if (pos == 0 or not _is_word_char(sentence[pos - 1])) and (
+            end == len(sentence) or not _is_word_char(sentence[end])
+        ):
+            parts.append(sentence[last:pos])
+            parts.append("_____")
+            last = end
+            pos = lowered.find(needle, end)
+        else:
+            pos = lowered.find(needle, pos + 1)
+    if not parts:
+        return None
+    parts.append(sentence[last:])
+    return "".join(parts)
+
+
 def _make_fill_in_question(term: str, sentence: str) -> Tuple[str, str]:
     """Create a fill-in-the-blank style question from a sentence containing the term."""
     # Replace exact term occurrences (case-insensitive) with blank
-    pattern = re.compile(rf"\b{re.escape(term)}\b", re.IGNORECASE)
-    blanks = pattern.sub("_____", sentence)
+    blanks = _blank_whole_words(term, sentence)
+    if blanks is None:
+        pattern = re.compile(rf"\b{re.escape(term)}\b", re.IGNORECASE)
+        blanks = pattern.sub("_____", sentence)
     # Trim if sentence is extremely long
     if len(blanks) > 220:
         blanks = blanks[:217].rstrip() + "..."
@@ -128,9 +212,8 @@ def _make_definition_like_question(term: str, support_sentence: str) -> Tuple[st
 
 def _sanitize_option(text: str) -> str:
     """Sanitize option text by collapsing whitespace and trimming."""
-    t = " ".join(text.split())
-    # Strip surrounding punctuation-only chars
-    return t.strip(string.punctuation + " ")
+    # Collapse whitespace runs, then strip surrounding punctuation and whitespace in one pass
+    return _WS_COLLAPSE.sub(" ", text).strip(_STRIP_CHARS)
 
 
 def _unique_preserve_order(items: List[str]) -> List[str]:
@@ -184,12 +267,13 @@ def generate_quiz_from_notes(notes: str, title: Optional[str] = None) -> Dict:
     """
     notes = (notes or "").strip()
     # Base hash drives determinism
-    src_hash = _stable_hash(notes)
-    rng = random.Random(_seed_from_hash(src_hash))
+    src_digest = _stable_digest(notes)
+    src_hash = src_digest.hex()
+    rng = random.Random(_seed_from_digest(src_digest))
 
     # Split and extract candidates
     sentences = _split_sentences(notes)
-    candidates = _collect_candidates(sentences)
+    candidates = list(_collect_candidates(tuple(sentences)))
 
     # Decide number of questions between 5 and 8 depending on candidates
     max_questions = 8
@@ -206,16 +290,17 @@ def generate_quiz_from_notes(notes: str, title: Optional[str] = None) -> Dict:
         if not tokens:
             tokens = [f"Concept{i}" for i in range(1, 12)]
         # Create pseudo candidates
-        freq: Dict[str, int] = {}
-        for t in tokens:
-            freq[t] = freq.get(t, 0) + 1
+        freq = Counter(tokens)
         sorted_tokens = sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))
-        candidates = [Candidate(term=t, freq=f, sentences=[notes]) for t, f in sorted_tokens[:12]]
+        candidates = [Candidate(term=t, freq=f, sentences=(notes,)) for t, f in sorted_tokens[:12]]
 
     # Pool of all unique terms for distractors
     all_terms = [c.term for c in candidates]
     all_terms = _unique_preserve_order(all_terms)
 
+    # Immutable distractor pool shared by all questions
+    term_pool = tuple(all_terms)
+
     # Pick candidate subset deterministically
     picked = candidates[:]
     rng.shuffle(picked)
@@ -237,7 +322,7 @@ def generate_quiz_from_notes(notes: str, title: Optional[str] = None) -> Dict:
             q_text, correct = _make_definition_like_question(cand.term, support)
 
         # Build options: correct + distractors
-        distractors = _pick_distractors(all_terms, correct, rng, 3)
+        distractors = _pick_distractors(term_pool, correct, rng, 3)
         raw_options = [correct] + distractors
         options = [_sanitize_option(o) for o in raw_options if o and o.strip()]
         # Ensure we have exactly 4 options; pad if necessary
@@ -277,16 +362,16 @@ def generate_quiz_from_notes(notes: str, title: Optional[str] = None) -> Dict:
 
     # Created at: deterministic pseudo timestamp string based on hash to avoid external deps
     # Format: YYYY-MM-DDTHH:MM:SSZ where components are derived from hash bytes
-    hbytes = bytes.fromhex(src_hash[:16])  # 8 bytes
-    y = 2000 + (hbytes[0] % 30)  # 2000-2029
-    mo = 1 + (hbytes[1] % 12)
-    d = 1 + (hbytes[2] % 28)
-    hh = hbytes[3] % 24
-    mm = hbytes[4] % 60
-    ss = hbytes[5] % 60
+    b0, b1, b2, b3, b4, b5 = struct.unpack_from("<6B", src_digest)
+    y = 2000 + (b0 % 30)  # 2000-2029
+    mo = 1 + (b1 % 12)
+    d = 1 + (b2 % 28)
+    hh = b3 % 24
+    mm = b4 % 60
+    ss = b5 % 60
     created_at = f"{y:04d}-{mo:02d}-{d:02d}T{hh:02d}:{mm:02d}:{ss:02d}Z"
 
-    quiz_id = f"quiz-{src_hash[:12]}"
+    quiz_id = _quiz_id_from_hash(src_hash)
 
     quiz = {
         "id": quiz_id,
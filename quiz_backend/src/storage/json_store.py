@@ -1,17 +1,155 @@
-import json
+import asyncio
+import bisect
+import mmap
 import os
 import tempfile
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
+import aiofiles
+import aiofiles.os
+import orjson
 
-DEFAULT_DATA_FILE = "./data/quizzes.json"
+from src.api.schemas import QuizOut, QuizQuestion
+
+
+DEFAULT_DATA_FILE = "./data/quizzes.jsonl"
+
+# Files at least this large are parsed from a read-only memory map instead of a single read()
+_MMAP_MIN_BYTES = 1024 * 1024
+
+
+def _created_at_key(quiz: Dict[str, Any]) -> str:
+    """Sort key used to keep cached quizzes ordered by creation timestamp."""
+    return str(quiz.get("created_at", ""))
+
+
+def _public_payload(quiz: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a stored quiz onto the QuizOut/QuizQuestion fields, dropping any other keys."""
+    payload = {k: quiz[k] for k in QuizOut.model_fields if k in quiz}
+    questions = payload.get("questions")
+    if isinstance(questions, list):
+        payload["questions"] = [
+            {k: q[k] for k in QuizQuestion.model_fields if k in q} if isinstance(q, dict) else q for q in questions
+        ]
+    return payload
+
+
+def _quiz_meta(quiz: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the compact listing entry for a quiz (id, title, created_at, question_count)."""
+    return {
+        "id": quiz.get("id", ""),
+        "title": quiz.get("title", ""),
+        "created_at": quiz.get("created_at", ""),
+        "question_count": len(quiz.get("questions", []) or []),
+    }
+
+
+def _parse_legacy(buf: Any) -> Optional[List[Dict[str, Any]]]:
+    """
+    Decode a legacy single-document store ({"quizzes": [...]}) from a bytes-like buffer.
+
+    Returns:
+        list[dict] | None: The quizzes if the buffer is a legacy document, otherwise None.
+    """
+    if not buf[:1024].lstrip().startswith(b"{"):
+        return None
+    view = memoryview(buf)
+    try:
+        data = orjson.loads(view)
+    except orjson.JSONDecodeError:
+        # A JSON Lines file with more than one record has trailing data after the first object
+        return None
+    finally:
+        view.release()
+    if isinstance(data, dict) and isinstance(data.get("quizzes"), list):
+        return [q for q in data["quizzes"] if isinstance(q, dict)]
+    return None
+
+
+def _parse_lines(buf: Any) -> Tuple[List[Dict[str, Any]], bool, int]:
+    """
+    Decode JSON lines from a bytes-like buffer (bytes or mmap).
+
+    Returns:
+        tuple: (quiz dicts, whether the file should be rewritten, number of skipped lines)
+    """
+    quizzes: List[Dict[str, Any]] = []
+    skipped = 0
+    size = len(buf)
+    torn = size > 0 and buf[size - 1:size] != b"\n"
+    pos = 0
+    while pos < size:
+        end = buf.find(b"\n", pos)
+        if end == -1:
+            end = size
+        line = buf[pos:end]
+        pos = end + 1
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            skipped += 1
+            continue
+        if isinstance(record, dict):
+            quizzes.append(record)
+        else:
+            skipped += 1
+    return quizzes, torn or skipped > 0, skipped
+
+
+def _parse_buffer(buf: Any) -> Tuple[List[Dict[str, Any]], bool, int]:
+    """Decode a store buffer, converting a legacy single-document store when found."""
+    legacy = _parse_legacy(buf)
+    if legacy is not None:
+        # Legacy documents are always rewritten as JSON Lines
+        return legacy, True, 0
+    return _parse_lines(buf)
+
+
+def _fail_waiters(batch: List[Tuple[Dict[str, Any], asyncio.Future]], exc: BaseException) -> None:
+    """Set exc on every add_quiz waiter in batch that has not been resolved yet."""
+    for _, done in batch:
+        if not done.done():
+            done.set_exception(exc)
 
 
 class QuizJsonStore:
     """
-    A simple JSON file store for quizzes with safe atomic write operations.
+    A simple JSON Lines file store for quizzes.
+
+    New quizzes are appended as a single line, so an insert costs the size of the
+    record rather than the size of the whole store. Full rewrites (save_all,
+    compact) go through a safe atomic write.
+
+    All I/O methods are coroutines so they can be awaited directly from async
+    request handlers without blocking the event loop.
+
+    The file is read once and kept in memory together with an id index; writes
+    update the cache after persisting, so reads never go back to disk. The cached
+    list is kept ordered by created_at on insert, so listing needs no sort. A
+    parallel list of small metadata dicts serves listing without touching the
+    full question payloads.
 
-    Data model:
+    Inserts are group-committed: a background task writes each batch with a
+    single fsync, taking up to QUIZ_FSYNC_BATCH quizzes (default 64) that queued
+    up while the previous write was in progress. A lone insert is flushed right
+    away. QUIZ_FSYNC_INTERVAL_MS (default 0) optionally waits that long after the
+    first insert to gather more; the wait is skipped when fsync is disabled.
+    add_quiz returns only once its batch is on disk.
+
+    Durability: by default every flush and atomic rewrite is fsynced before it
+    is acknowledged. Setting QUIZ_FSYNC to 0, false, no or off skips fsync and
+    leaves writeback to the OS, which makes writes much faster but means a crash
+    or power loss can drop the most recently acknowledged quizzes. Any other
+    value keeps fsync on. Atomic rewrites still never expose a partially-written
+    file to readers.
+
+    On-disk format (one quiz object per line):
+        { ...quiz dict... }
+        { ...quiz dict... }
+
+    In-memory data model:
     {
         "quizzes": [ { ...quiz dict... }, ... ]
     }
@@ -33,39 +171,97 @@ class QuizJsonStore:
         parent_dir = os.path.dirname(self.path) or "."
         os.makedirs(parent_dir, exist_ok=True)
 
+        # In-memory view of the file and quiz id -> quiz lookup, populated lazily
+        self._cache: Optional[Dict[str, Any]] = None
+        self._index: Dict[str, Dict[str, Any]] = {}
+        # Listing metadata, index-aligned with the cached quizzes list
+        self._metas: List[Dict[str, Any]] = []
+        # Quiz id -> JSON bytes; quizzes are immutable once stored, so encodings are reused
+        self._encoded: Dict[str, bytes] = {}
+        # Serializes cache population and writes
+        self._lock = asyncio.Lock()
+
+        # Whether writes are fsynced before being acknowledged (see class docstring)
+        # Only an explicit false value disables fsync; anything else keeps durability on
+        self._fsync = os.getenv("QUIZ_FSYNC", "1").strip().lower() not in ("0", "false", "no", "off")
+
+        # Group commit settings and state for the background flusher
+        self._batch_size = max(1, int(os.getenv("QUIZ_FSYNC_BATCH", "64")))
+        # Without fsync there is no disk barrier to share, so never hold inserts back
+        interval_ms = float(os.getenv("QUIZ_FSYNC_INTERVAL_MS", "0")) if self._fsync else 0.0
+        self._flush_interval = max(0.0, interval_ms / 1000.0)
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+
     # PUBLIC_INTERFACE
-    def load_all(self) -> Dict[str, Any]:
+    async def load_all(self) -> Dict[str, Any]:
         """
-        Load and return the entire data structure from the JSON file.
+        Return the entire data structure, reading the JSON file on first use only.
         If the file does not exist, it will be created with the default structure.
 
         Returns:
-            dict: The data in the form {"quizzes": [ ... ]}.
+            dict: The data in the form {"quizzes": [ ... ]}. This is the live cache;
+                  callers must not mutate it.
         """
-        if not os.path.exists(self.path):
-            default_data = {"quizzes": []}
-            self._atomic_write(default_data)
-            return default_data
+        if self._cache is None:
+            async with self._lock:
+                if self._cache is None:
+                    self._set_cache(await self._read_file())
+        return self._cache
 
-        try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except json.JSONDecodeError:
-            # If the file is corrupted, reset to default structure to keep service functioning.
-            data = {"quizzes": []}
-            self._atomic_write(data)
+    async def _read_file(self) -> Dict[str, Any]:
+        """
+        Read the JSON Lines file, creating it, migrating a legacy JSON document or
+        dropping torn/corrupted lines when needed.
 
-        # Normalize structure
-        if not isinstance(data, dict) or "quizzes" not in data or not isinstance(data["quizzes"], list):
+        Raises:
+            ValueError: If the file has content but no line could be parsed; the file
+                        is left untouched rather than replaced by an empty store.
+        """
+        if not await aiofiles.os.path.exists(self.path):
             data = {"quizzes": []}
-            self._atomic_write(data)
+            legacy_path = self._legacy_path()
+            if legacy_path is not None and await aiofiles.os.path.exists(legacy_path):
+                # Import the pre-JSON Lines store; the legacy file itself is left in place
+                quizzes, _, _ = await self._parse_file(legacy_path)
+                data = {"quizzes": quizzes}
+            await self._atomic_write(data)
+            return data
 
+        quizzes, dirty, skipped = await self._parse_file(self.path)
+        if skipped and not quizzes:
+            raise ValueError(f"No quiz record in {self.path} could be parsed; refusing to overwrite it")
+
+        data = {"quizzes": quizzes}
+        if dirty:
+            # Rewrite as clean JSON Lines (legacy conversion, torn or corrupted lines)
+            # so later appends start on a clean line.
+            await self._atomic_write(data)
         return data
 
+    def _legacy_path(self) -> Optional[str]:
+        """Return the pre-JSON Lines data file (same name, .json) for a .jsonl path, if any."""
+        root, ext = os.path.splitext(self.path)
+        return root + ".json" if ext == ".jsonl" else None
+
+    async def _parse_file(self, path: str) -> Tuple[List[Dict[str, Any]], bool, int]:
+        """Read and decode a store file, memory-mapping it when it is large."""
+        if await aiofiles.os.path.getsize(path) >= _MMAP_MIN_BYTES:
+            # Let the OS page the file in rather than copying it into one large buffer
+            return await asyncio.to_thread(self._read_mapped, path)
+        async with aiofiles.open(path, "rb") as f:
+            raw = await f.read()
+        return _parse_buffer(raw)
+
+    def _read_mapped(self, path: str) -> Tuple[List[Dict[str, Any]], bool, int]:
+        """Parse a store file through a read-only memory map (blocking; run in a thread)."""
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _parse_buffer(mm)
+
     # PUBLIC_INTERFACE
-    def save_all(self, data: Dict[str, Any]) -> None:
+    async def save_all(self, data: Dict[str, Any]) -> None:
         """
-        Persist the provided data to the JSON file using an atomic write.
+        Replace the whole store with the provided data using an atomic rewrite.
 
         Args:
             data (dict): The full data structure to persist.
@@ -76,28 +272,46 @@ class QuizJsonStore:
         if "quizzes" not in data or not isinstance(data["quizzes"], list):
             raise ValueError("Data must contain 'quizzes' as a list")
 
-        self._atomic_write(data)
+        async with self._lock:
+            await self._atomic_write(data)
+            self._set_cache(data)
 
     # PUBLIC_INTERFACE
-    def add_quiz(self, quiz: Dict[str, Any]) -> Dict[str, Any]:
+    async def add_quiz(self, quiz: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Append a quiz to the store and persist.
+        Append a quiz to the store as a single JSON line and persist.
+
+        The write is batched with concurrent inserts; this waits until the
+        batch containing the quiz has been flushed. If a quiz with the same id is
+        already stored (or earlier in the same batch), nothing is written and the
+        stored quiz is returned instead.
 
         Args:
             quiz (dict): Quiz object. Expected to contain an 'id' key for retrieval.
 
         Returns:
-            dict: The same quiz object after persistence.
+            dict: The persisted quiz object for this id.
         """
-        data = self.load_all()
-        quizzes: List[Dict[str, Any]] = data.get("quizzes", [])
-        quizzes.append(quiz)
-        data["quizzes"] = quizzes
-        self.save_all(data)
-        return quiz
+        await self.load_all()
+        queue = self._ensure_flusher()
+        done = asyncio.get_running_loop().create_future()
+        await queue.put((quiz, done))
+        return await done
 
     # PUBLIC_INTERFACE
-    def get_quiz(self, quiz_id: str) -> Optional[Dict[str, Any]]:
+    async def aclose(self) -> None:
+        """Flush pending inserts and stop the background flusher task."""
+        flusher, queue = self._flusher, self._queue
+        self._flusher = None
+        self._queue = None
+        if flusher is None or queue is None or flusher.done():
+            return
+        # The sentinel is queued behind pending inserts, so they are flushed first
+        await queue.put(None)
+        await flusher
+
+    # PUBLIC_INTERFACE
+    async def get_quiz(self, quiz_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve a quiz by its identifier.
 
@@ -107,41 +321,223 @@ class QuizJsonStore:
         Returns:
             dict | None: The quiz dict if found, otherwise None.
         """
-        data = self.load_all()
-        for q in data.get("quizzes", []):
-            if isinstance(q, dict) and str(q.get("id")) == str(quiz_id):
-                return q
-        return None
+        await self.load_all()
+        return self._index.get(str(quiz_id))
+
+    # PUBLIC_INTERFACE
+    async def get_quiz_json(self, quiz_id: str) -> Optional[bytes]:
+        """
+        Retrieve a quiz by its identifier, already serialized as JSON.
+
+        Only the QuizOut schema fields are encoded, matching what the other
+        endpoints return. The encoding is computed at most once per quiz and
+        served from memory afterwards.
+
+        Args:
+            quiz_id (str): The quiz identifier.
+
+        Returns:
+            bytes | None: The UTF-8 JSON document if found, otherwise None.
+        """
+        quiz = await self.get_quiz(quiz_id)
+        if quiz is None:
+            return None
+        key = str(quiz_id)
+        payload = self._encoded.get(key)
+        if payload is None:
+            payload = orjson.dumps(_public_payload(quiz))
+            self._encoded[key] = payload
+        return payload
 
     # PUBLIC_INTERFACE
-    def list_quizzes(self) -> List[Dict[str, Any]]:
+    async def list_quizzes(self) -> List[Dict[str, Any]]:
         """
-        Return the list of all quizzes.
+        Return the list of all quizzes, newest first by created_at.
 
         Returns:
             list[dict]: List of quiz dictionaries.
         """
-        data = self.load_all()
-        return list(data.get("quizzes", []))
+        data = await self.load_all()
+        return data["quizzes"][::-1]
+
+    # PUBLIC_INTERFACE
+    async def compact(self) -> None:
+        """
+        Rewrite the log from the in-memory state, e.g. after records were removed.
+
+        Appends never rewrite existing lines, so this is the only operation
+        (besides save_all) that reclaims space in the file.
+        """
+        await self.load_all()
+        async with self._lock:
+            # Read the cache under the lock so a concurrent save_all is not overwritten with stale data
+            await self._atomic_write(self._cache)
+
+    # PUBLIC_INTERFACE
+    async def list_quiz_metas(self) -> List[Dict[str, Any]]:
+        """
+        Return listing metadata for all quizzes, newest first by created_at.
+
+        Returns:
+            list[dict]: Entries with 'id', 'title', 'created_at' and 'question_count'.
+        """
+        await self.load_all()
+        return self._metas[::-1]
+
+    def _set_cache(self, data: Dict[str, Any]) -> None:
+        """Replace the in-memory cache with an ordered copy of data and rebuild the id index."""
+        quizzes = [q for q in data["quizzes"] if isinstance(q, dict)]
+        index: Dict[str, Dict[str, Any]] = {}
+        for q in quizzes:
+            # First occurrence in file order wins, matching the previous linear scan semantics
+            index.setdefault(str(q.get("id")), q)
+        # Stable descending sort then reverse: ascending order whose reversal matches a
+        # stable newest-first sort of the original (file) order.
+        quizzes.sort(key=_created_at_key, reverse=True)
+        quizzes.reverse()
+        # Build a fresh dict so the caller's data (e.g. passed to save_all) is never modified
+        self._cache = {**data, "quizzes": quizzes}
+        self._index = index
+        self._metas = [_quiz_meta(q) for q in quizzes]
+        self._encoded = {}
 
-    def _atomic_write(self, data: Dict[str, Any]) -> None:
+    async def _atomic_write(self, data: Dict[str, Any]) -> None:
         """
-        Write JSON to a temporary file and atomically replace the target.
+        Write all quizzes as JSON lines to a temporary file and atomically replace the target.
 
-        This ensures that readers never see a partially-written file.
+        This ensures that readers never see a partially-written file. Blocking
+        filesystem calls (mkstemp, fsync, replace) are offloaded to a worker thread.
         """
         directory = os.path.dirname(self.path) or "."
-        fd, tmp_path = tempfile.mkstemp(prefix=".quizzes.", suffix=".tmp", dir=directory, text=True)
+        fd, tmp_path = await asyncio.to_thread(
+            tempfile.mkstemp, prefix=".quizzes.", suffix=".tmp", dir=directory
+        )
+        # aiofiles opens by path; release the descriptor returned by mkstemp
+        os.close(fd)
         try:
-            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
-                json.dump(data, tmp_file, indent=2, ensure_ascii=False)
-                tmp_file.flush()
-                os.fsync(tmp_file.fileno())
-            os.replace(tmp_path, self.path)
+            async with aiofiles.open(tmp_path, "wb") as tmp_file:
+                # orjson emits UTF-8 bytes directly, so no str->bytes encoding pass is needed
+                await tmp_file.write(b"".join(orjson.dumps(q) + b"\n" for q in data["quizzes"]))
+                if self._fsync:
+                    await tmp_file.flush()
+                    await asyncio.to_thread(os.fsync, tmp_file.fileno())
+            await asyncio.to_thread(os.replace, tmp_path, self.path)
         finally:
             # If os.replace succeeded, tmp_path no longer exists; ignore errors
             try:
-                if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
+                if await aiofiles.os.path.exists(tmp_path):
+                    await aiofiles.os.remove(tmp_path)
             except OSError:
                 pass
+
+    def _ensure_flusher(self) -> asyncio.Queue:
+        """Start the background flusher on the running loop if needed and return its queue."""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._flusher is None or self._flusher.done() or self._flusher.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._flusher = loop.create_task(self._flush_loop(self._queue))
+        return self._queue
+
+    async def _flush_loop(self, queue: asyncio.Queue) -> None:
+        """
+        Drain the insert queue in batches until the shutdown sentinel arrives.
+
+        A failing batch fails only its own waiters and the loop keeps running. If the
+        loop itself stops (cancellation or an unexpected error), every waiter still
+        in the batch or the queue is failed so no add_quiz call is left hanging.
+        """
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                batch = [item]
+                stop = False
+                # With no interval this only drains inserts that queued up during the previous write
+                deadline = loop.time() + self._flush_interval
+                while len(batch) < self._batch_size:
+                    timeout = deadline - loop.time()
+                    try:
+                        item = queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(queue.get(), timeout)
+                    except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    batch.append(item)
+                try:
+                    await self._flush_batch(batch)
+                except Exception as exc:
+                    _fail_waiters(batch, exc)
+                batch = []
+                if stop:
+                    return
+        except BaseException as exc:
+            error = exc if isinstance(exc, Exception) else RuntimeError("Quiz store flusher was stopped")
+            _fail_waiters(batch, error)
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is not None:
+                    _fail_waiters([item], error)
+            raise
+
+    async def _flush_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """Append a batch of quizzes with one write and fsync, then update the cache and waiters."""
+        await self.load_all()
+        async with self._lock:
+            # Read the cache under the lock: a concurrent save_all may have replaced it
+            quizzes: List[Dict[str, Any]] = self._cache["quizzes"]
+            encoded: List[Tuple[str, Dict[str, Any], asyncio.Future, bytes]] = []
+            batch_ids: Dict[str, Dict[str, Any]] = {}
+            duplicates: List[Tuple[str, asyncio.Future]] = []
+            for quiz, done in batch:
+                key = str(quiz.get("id"))
+                if key in self._index or key in batch_ids:
+                    # Already stored or queued earlier in this batch: write nothing, hand back the stored quiz
+                    duplicates.append((key, done))
+                    continue
+                try:
+                    line = orjson.dumps(quiz) + b"\n"
+                except TypeError as exc:
+                    # Only the offending insert fails; the rest of the batch is still written
+                    if not done.done():
+                        done.set_exception(exc)
+                    continue
+                batch_ids[key] = quiz
+                encoded.append((key, quiz, done, line))
+
+            if encoded:
+                try:
+                    await self._append_lines(b"".join(line for _, _, _, line in encoded))
+                except Exception as exc:
+                    for _, _, done, _ in encoded:
+                        if not done.done():
+                            done.set_exception(exc)
+                    for key, done in duplicates:
+                        # Duplicates of a record that was just lost fail with it
+                        if key not in self._index and not done.done():
+                            done.set_exception(exc)
+                    encoded = []
+
+            for key, quiz, done, _ in encoded:
+                # Insert before equal timestamps so newest-first listing keeps older entries first on ties
+                meta = _quiz_meta(quiz)
+                pos = bisect.bisect_left(self._metas, _created_at_key(quiz), key=_created_at_key)
+                quizzes.insert(pos, quiz)
+                self._metas.insert(pos, meta)
+                self._index[key] = quiz
+                if not done.done():
+                    done.set_result(quiz)
+            for key, done in duplicates:
+                if not done.done():
+                    done.set_result(self._index[key])
+
+    async def _append_lines(self, payload: bytes) -> None:
+        """Append already-encoded JSON lines to the log and, unless disabled, fsync them."""
+        async with aiofiles.open(self.path, "ab") as f:
+            await f.write(payload)
+            if self._fsync:
+                await f.flush()
+                await asyncio.to_thread(os.fsync, f.fileno())
@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.api import main
+
+NOTES = (
+    "Photosynthesis converts light energy into chemical energy. Chlorophyll absorbs light in plants. "
+    "The Calvin cycle fixes carbon dioxide into sugars. Plants release oxygen as a byproduct."
+)
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    path = tmp_path / "quizzes.jsonl"
+    monkeypatch.setenv("QUIZ_DATA_FILE", str(path))
+    main._get_store_singleton.cache_clear()
+    yield path
+    main._get_store_singleton.cache_clear()
+
+
+async def _request_all(*requests):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.request(method, url, **kw) for method, url, kw in requests))
+        listing = await client.get("/quizzes")
+    await main.get_store().aclose()
+    return responses, listing
+
+
+def test_concurrent_identical_submissions_store_one_quiz(data_file):
+    responses, listing = asyncio.run(_request_all(*[("POST", "/notes", {"json": {"notes": NOTES}})] * 4))
+
+    assert [r.status_code for r in responses] == [201] * 4
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert len(listing.json()) == 1
+    assert len(data_file.read_text().splitlines()) == 1
+
+
+def test_get_quiz_returns_only_schema_fields(data_file):
+    stored = {
+        "id": "quiz-extra",
+        "title": "Stored",
+        "created_at": "2020-01-01T00:00:00Z",
+        "source_notes_hash": "h",
+        "internal_owner": "ops",
+        "questions": [{"id": "q-1", "question": "Q?", "options": ["a", "b", "c", "d"], "correct_index": 1, "debug": 1}],
+    }
+    data_file.write_text(json.dumps(stored) + "\n")
+
+    responses, _ = asyncio.run(_request_all(("GET", "/quizzes/quiz-extra", {})))
+
+    body = responses[0].json()
+    assert "internal_owner" not in body
+    assert "debug" not in body["questions"][0]
+    assert body == main._quiz_out(stored).model_dump()
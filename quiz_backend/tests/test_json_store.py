@@ -0,0 +1,231 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from src.storage.json_store import QuizJsonStore
+
+
+def _quiz(quiz_id, created_at="2020-01-01T00:00:00Z"):
+    return {"id": quiz_id, "title": "t", "created_at": created_at, "source_notes_hash": "h", "questions": []}
+
+
+def _ids(store):
+    return [q["id"] for q in asyncio.run(store.list_quizzes())]
+
+
+def test_legacy_document_at_data_path_is_converted(tmp_path):
+    path = tmp_path / "quizzes.json"
+    path.write_text(json.dumps({"quizzes": [_quiz("a", "1"), _quiz("b", "2")]}, indent=2))
+
+    assert _ids(QuizJsonStore(str(path))) == ["b", "a"]
+    # Converted in place to one record per line and readable again
+    assert len(path.read_text().splitlines()) == 2
+    assert _ids(QuizJsonStore(str(path))) == ["b", "a"]
+
+
+def test_legacy_sibling_file_is_imported(tmp_path):
+    legacy = tmp_path / "quizzes.json"
+    legacy.write_text(json.dumps({"quizzes": [_quiz("a")]}, indent=2))
+
+    assert _ids(QuizJsonStore(str(tmp_path / "quizzes.jsonl"))) == ["a"]
+    assert legacy.exists()
+
+
+def test_torn_lines_are_dropped(tmp_path):
+    path = tmp_path / "quizzes.jsonl"
+    path.write_text(json.dumps(_quiz("a")) + "\n[1]\n" + '{"id": "b"')
+
+    assert _ids(QuizJsonStore(str(path))) == ["a"]
+    assert path.read_text() == json.dumps(_quiz("a"), separators=(",", ":")) + "\n"
+
+
+def test_unparseable_file_is_not_overwritten(tmp_path):
+    path = tmp_path / "quizzes.jsonl"
+    path.write_text("garbage\nmore garbage\n")
+
+    with pytest.raises(ValueError):
+        asyncio.run(QuizJsonStore(str(path)).load_all())
+    assert path.read_text() == "garbage\nmore garbage\n"
+
+
+def test_save_all_does_not_modify_caller_data(tmp_path):
+    store = QuizJsonStore(str(tmp_path / "quizzes.jsonl"))
+    quizzes = [_quiz("old", "1"), "not a quiz", _quiz("new", "2")]
+    data = {"quizzes": quizzes}
+
+    asyncio.run(store.save_all(data))
+
+    assert data["quizzes"] is quizzes
+    assert quizzes == [_quiz("old", "1"), "not a quiz", _quiz("new", "2")]
+    assert _ids(store) == ["new", "old"]
+
+
+def test_duplicate_ids_are_written_once(tmp_path):
+    path = tmp_path / "quizzes.jsonl"
+    store = QuizJsonStore(str(path))
+
+    async def run():
+        first, second = _quiz("a"), _quiz("a")
+        results = await asyncio.gather(store.add_quiz(first), store.add_quiz(second))
+        again = await store.add_quiz(_quiz("a"))
+        await store.aclose()
+        return first, results, again
+
+    first, results, again = asyncio.run(run())
+
+    assert results[0] is first and results[1] is first and again is first
+    assert _ids(store) == ["a"]
+    assert len(path.read_text().splitlines()) == 1
+
+
+def test_concurrent_inserts_are_group_committed(tmp_path, monkeypatch):
+    path = tmp_path / "quizzes.jsonl"
+    fsyncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (fsyncs.append(fd), real_fsync(fd)))
+    store = QuizJsonStore(str(path))
+    quizzes = [_quiz(f"q{i}", f"2020-01-01T00:00:{i % 60:02d}Z") for i in range(100)]
+
+    async def run():
+        await store.load_all()
+        fsyncs.clear()
+        results = await asyncio.gather(*(store.add_quiz(q) for q in quizzes))
+        await store.aclose()
+        return results
+
+    assert asyncio.run(run()) == quizzes
+    assert len(fsyncs) < len(quizzes)
+    expected = [q["id"] for q in sorted(quizzes, key=lambda q: q["created_at"], reverse=True)]
+    assert _ids(store) == expected
+    assert _ids(QuizJsonStore(str(path))) == expected
+    assert [m["id"] for m in asyncio.run(store.list_quiz_metas())] == expected
+
+
+def test_failed_write_fails_its_waiters_and_flusher_recovers(tmp_path):
+    path = tmp_path / "quizzes.jsonl"
+    store = QuizJsonStore(str(path))
+    real_append = store._append_lines
+
+    async def failing_append(payload):
+        store._append_lines = real_append
+        raise OSError("disk full")
+
+    async def run():
+        await store.load_all()
+        store._append_lines = failing_append
+        results = await asyncio.wait_for(
+            asyncio.gather(store.add_quiz(_quiz("a")), store.add_quiz(_quiz("b")), return_exceptions=True), 5
+        )
+        after = await asyncio.wait_for(store.add_quiz(_quiz("c")), 5)
+        await store.aclose()
+        return results, after
+
+    results, after = asyncio.run(run())
+
+    assert all(isinstance(r, OSError) for r in results)
+    assert after["id"] == "c"
+    assert _ids(store) == ["c"]
+    assert _ids(QuizJsonStore(str(path))) == ["c"]
+
+
+def test_unexpected_flush_error_does_not_hang_waiters(tmp_path):
+    store = QuizJsonStore(str(tmp_path / "quizzes.jsonl"))
+    real_flush = store._flush_batch
+
+    async def broken_flush(batch):
+        store._flush_batch = real_flush
+        raise RuntimeError("boom")
+
+    async def run():
+        store._flush_batch = broken_flush
+        with pytest.raises(RuntimeError, match="boom"):
+            await asyncio.wait_for(store.add_quiz(_quiz("a")), 5)
+        # The flusher survived and keeps serving inserts
+        await asyncio.wait_for(store.add_quiz(_quiz("b")), 5)
+        await store.aclose()
+
+    asyncio.run(run())
+    assert _ids(store) == ["b"]
+
+
+def test_cancelled_flusher_fails_queued_waiters(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUIZ_FSYNC_INTERVAL_MS", "60000")
+    store = QuizJsonStore(str(tmp_path / "quizzes.jsonl"))
+
+    async def run():
+        waiters = [asyncio.ensure_future(store.add_quiz(_quiz(f"q{i}"))) for i in range(3)]
+        await asyncio.sleep(0.05)
+        store._flusher.cancel()
+        return await asyncio.wait_for(asyncio.gather(*waiters, return_exceptions=True), 5)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_save_all_concurrent_with_add_quiz_keeps_cache_consistent(tmp_path):
+    path = tmp_path / "quizzes.jsonl"
+    store = QuizJsonStore(str(path))
+    real_write = store._atomic_write
+
+    async def slow_write(data):
+        # Hold the store lock long enough for the flusher to wait on it
+        await asyncio.sleep(0.1)
+        await real_write(data)
+
+    async def run():
+        await store.add_quiz(_quiz("q0", "0"))
+        store._atomic_write = slow_write
+        await asyncio.gather(store.save_all({"quizzes": [_quiz("q1", "1")]}), store.add_quiz(_quiz("q100", "2")))
+        listed = [q["id"] for q in await store.list_quizzes()]
+        metas = [m["id"] for m in await store.list_quiz_metas()]
+        found = [quiz_id for quiz_id in listed if await store.get_quiz(quiz_id) is not None]
+        await store.aclose()
+        return listed, metas, found
+
+    listed, metas, found = asyncio.run(run())
+
+    assert listed == metas == found
+    assert sorted(store._index) == sorted(listed)
+    assert _ids(QuizJsonStore(str(path))) == listed
+    assert listed == ["q100", "q1"]
+
+
+def test_lone_insert_is_flushed_without_waiting(tmp_path, monkeypatch):
+    monkeypatch.delenv("QUIZ_FSYNC_INTERVAL_MS", raising=False)
+    store = QuizJsonStore(str(tmp_path / "quizzes.jsonl"))
+    assert store._flush_interval == 0
+
+    async def run():
+        await store.load_all()
+        start = asyncio.get_running_loop().time()
+        await store.add_quiz(_quiz("a"))
+        elapsed = asyncio.get_running_loop().time() - start
+        await store.aclose()
+        return elapsed
+
+    assert asyncio.run(run()) < 1
+
+
+def test_batch_window_is_skipped_without_fsync(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUIZ_FSYNC", "0")
+    monkeypatch.setenv("QUIZ_FSYNC_INTERVAL_MS", "60000")
+    store = QuizJsonStore(str(tmp_path / "quizzes.jsonl"))
+
+    async def run():
+        await asyncio.wait_for(store.add_quiz(_quiz("a")), 5)
+        await store.aclose()
+
+    asyncio.run(run())
+    assert _ids(store) == ["a"]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("1", True), ("true", True), ("YES", True), ("on", True), ("0", False), ("false", False), (" No ", False),
+     ("off", False)],
+)
+def test_fsync_is_only_disabled_by_explicit_false_values(tmp_path, monkeypatch, value, expected):
+    monkeypatch.setenv("QUIZ_FSYNC", value)
+    assert QuizJsonStore(str(tmp_path / "quizzes.jsonl"))._fsync is expected
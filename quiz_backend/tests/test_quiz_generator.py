@@ -0,0 +1,61 @@
+import re
+
+import pytest
+
+from src.services.quiz_generator import _blank_whole_words, _make_fill_in_question, generate_quiz_from_notes
+
+
+PHOTOSYNTHESIS_NOTES = (
+    "Photosynthesis converts light energy into chemical energy. Chlorophyll absorbs light in plants. "
+    "The Calvin cycle fixes carbon dioxide into sugars! Plants release oxygen as a byproduct. "
+    "Photosynthesis happens in chloroplasts? Chloroplasts contain chlorophyll and enzymes."
+)
+
+
+def _regex_fill_in(term, sentence):
+    """Previous implementation: regex substitution of whole-word, case-insensitive matches."""
+    blanks = re.compile(rf"\b{re.escape(term)}\b", re.IGNORECASE).sub("_____", sentence)
+    if len(blanks) > 220:
+        blanks = blanks[:217].rstrip() + "..."
+    return f"In the context of the notes, which term best completes the blank: '{blanks}'?", term
+
+
+@pytest.mark.parametrize(
+    "term, sentence",
+    [
+        ("cell", "Cell walls protect the plant."),
+        ("cell", "Energy is stored in the cell"),
+        ("cell", "The cell divides, and each cell grows."),
+        ("cell", "Many cells form tissue."),
+        ("cell", "A cell_wall differs from a cellular cell."),
+        ("energy", "ENERGY is conserved; energy changes form."),
+        ("energy", "Nothing to blank here."),
+        # Lowercasing changes the length of this sentence, so the regex fallback is used
+        ("cell", "İstanbul has a cell museum."),
+        ("kelvin", "Temperature in Kelvin: kelvin is an SI unit."),
+    ],
+)
+def test_fill_in_question_matches_regex_substitution(term, sentence):
+    assert _make_fill_in_question(term, sentence) == _regex_fill_in(term, sentence)
+
+
+def test_length_changing_lowercase_takes_regex_fallback():
+    assert _blank_whole_words("cell", "İstanbul has a cell museum.") is None
+
+
+def test_generated_quiz_is_pinned_for_known_notes():
+    quiz = generate_quiz_from_notes(PHOTOSYNTHESIS_NOTES)
+
+    assert quiz["id"] == "quiz-fb0c393b4b87"
+    assert quiz["created_at"] == "2011-01-02T11:15:15Z"
+    assert quiz["title"] == "Quiz: Chlorophyll & Chloroplasts"
+    assert [(q["options"], q["correct_index"]) for q in quiz["questions"]] == [
+        (["absorbs", "byproduct", "contain", "happens"], 0),
+        (["oxygen", "light", "chemical", "contain"], 0),
+        (["light", "release", "absorbs", "chloroplasts"], 3),
+        (["energy", "chloroplasts", "plants", "absorbs"], 2),
+        (["cycle", "absorbs", "sugars", "happens"], 2),
+        (["happens", "plants", "release", "dioxide"], 0),
+        (["oxygen", "chloroplasts", "absorbs", "energy"], 3),
+        (["fixes", "cycle", "contain", "chloroplasts"], 2),
+    ]